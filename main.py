@@ -1,21 +1,59 @@
 # main.py
 
 import asyncio
+import functools
 import logging
+import os
+import threading
 from typing import Any, Dict, List, Optional
 
 from llama_index import GPTIndex, ServiceContext, LLMPredictor
-from tools import generate_research_topics, analyze_data, create_presentation, narrate_report
+from tools import generate_research_topics, analyze_pages, create_presentation, narrate_report
 from mcp_integration import MCPClient
-import requests
-from bs4 import BeautifulSoup
+from http_session import NO_CACHE_HEADERS, create_async_client
+from report_cache import ReportCache, make_cache_key, normalize_topic
+import httpx
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Headless backend; select before pyplot is imported
 import matplotlib.pyplot as plt
-import pandas as pd
+from matplotlib import font_manager
+# Process-wide plot settings: path simplification for bar-heavy plots and the
+# bundled font, so rendering never falls back through other families
+plt.style.use('fast')
+matplotlib.rcParams['font.family'] = 'DejaVu Sans'
+# The FontManager is built when pyplot is imported; this only primes findfont's
+# lookup cache so the first savefig doesn't pay for resolving the font
+font_manager.fontManager.findfont(matplotlib.rcParams['font.family'][0])
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows; fall back to the stdlib event loop
+    uvloop = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+# Analyzed per-subtopic data, persisted so later runs skip fetching and parsing
+SUBTOPIC_DATA_DIR = os.path.join("cache", "data")
+
+@functools.cache
+def _get_service_context() -> ServiceContext:
+    """
+    Create and return the ServiceContext for llama_index. Cached so every
+    ResearchAgent in the process shares one predictor instead of rebuilding it.
+    """
+    try:
+        predictor = LLMPredictor()
+        return ServiceContext.from_defaults(llm_predictor=predictor)
+    except Exception as e:
+        logger.error(f"Error creating service context: {e}")
+        raise
+
 class ResearchAgent:
     """
     An agent-based system to perform automated research report generation,
@@ -27,89 +65,163 @@ class ResearchAgent:
         Initialize the ResearchAgent with MCP server URL.
         """
         self.mcp_client = MCPClient(mcp_server_url)
-        self.service_context = self._create_service_context()
-
-    def _create_service_context(self) -> ServiceContext:
+        self.service_context = _get_service_context()
+        # In-process memo of article text keyed by subtopic title
+        self._page_cache: Dict[str, str] = {}
+        self.report_cache = ReportCache()
+        os.makedirs(SUBTOPIC_DATA_DIR, exist_ok=True)
+        # Reused across reports to avoid per-call pyplot figure setup; the lock
+        # serializes drawing when reports render from worker threads concurrently
+        self.figure, self.axes = plt.subplots()
+        self._plot_lock = threading.Lock()
+
+    def _subtopic_data_path(self, subtopic: str) -> str:
         """
-        Create and return a ServiceContext for llama_index.
+        Return the Parquet path holding the analyzed data for a subtopic.
         """
-        try:
-            predictor = LLMPredictor()
-            return ServiceContext.from_defaults(llm_predictor=predictor)
-        except Exception as e:
-            logger.error(f"Error creating service context: {e}")
-            raise
+        return os.path.join(SUBTOPIC_DATA_DIR, f"{make_cache_key(normalize_topic(subtopic))}.parquet")
 
-    def fetch_web_data(self, url: str) -> str:
+    async def _query_extract(self, client: httpx.AsyncClient, title: str, force_refresh: bool = False) -> str:
         """
-        Fetch web page content from the given URL.
+        Fetch the plain-text extract of one article from the query API,
+        following redirects and title normalization. Returns "" on failure.
+        With force_refresh the on-disk HTTP cache is bypassed.
         """
+        params = {
+            "action": "query", "format": "json", "formatversion": 2,
+            "prop": "extracts", "explaintext": 1, "redirects": 1,
+            "titles": title,
+        }
         try:
-            response = requests.get(url)
+            response = await client.get(WIKIPEDIA_API_URL, params=params,
+                                        headers=NO_CACHE_HEADERS if force_refresh else None)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            text_content = soup.get_text()
-            logger.info(f"Fetched data from {url}")
-            return text_content
-        except requests.RequestException as e:
-            logger.error(f"Error fetching data from {url}: {e}")
+            pages = response.json().get("query", {}).get("pages", [])
+            text = pages[0].get("extract", "") if pages else ""
+            logger.info(f"Fetched extract for {title}")
+            return text
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Error fetching extract for {title}: {e}")
             return ""
 
-    def generate_research_report(self, topic: str) -> Dict[str, Any]:
+    async def fetch_web_data(self, client: httpx.AsyncClient, titles: List[str],
+                             force_refresh: bool = False) -> List[str]:
+        """
+        Fetch the plain text of the Wikipedia articles for the given titles.
+        TextExtracts returns only one full-text extract per response, so each
+        title gets its own query and all of them run concurrently over the
+        shared HTTP/2 connection. With force_refresh, the in-process memo and the
+        on-disk HTTP cache are both skipped.
+        """
+        pending = list(dict.fromkeys(title for title in titles if force_refresh or title not in self._page_cache))
+        texts = await asyncio.gather(*[self._query_extract(client, title, force_refresh) for title in pending])
+        self._page_cache.update({title: text for title, text in zip(pending, texts) if text})
+        return [self._page_cache.get(title, "") for title in titles]
+
+    def _render_plot(self, topic: str, values: Any, path: str) -> None:
+        """
+        Draw the analysis bar chart on the shared figure and save it to path.
+        """
+        with self._plot_lock:
+            self.axes.clear()
+            self.axes.bar(range(len(values)), values)
+            self.axes.set_title(f"Data Analysis for {topic}")
+            self.figure.savefig(path, dpi=100)
+
+    def _lookup_cached_report(self, cache_key: str, topic: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached report by exact key, falling back to a semantic match.
+        """
+        return self.report_cache.get(cache_key) or self.report_cache.find_similar(topic)
+
+    def _load_subtopic_tables(self, data_paths: List[str]) -> Dict[int, pa.Table]:
+        """
+        Read the persisted Parquet data that exists, keyed by subtopic index.
+        """
+        return {i: pq.read_table(path, memory_map=True) for i, path in enumerate(data_paths) if os.path.exists(path)}
+
+    async def generate_research_report(self, topic: str, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Perform research on the given topic and generate a report.
+        Previously compiled reports for the same or a near-identical topic are
+        returned from the report cache unless force_refresh is set.
         """
         try:
             # Step 1: Generate research subtopics
-            subtopics = generate_research_topics(topic)
+            subtopics = await asyncio.to_thread(generate_research_topics, topic)
             logger.info(f"Generated subtopics: {subtopics}")
 
-            # Step 2: Collect data for each subtopic
-            data_frames = []
-            for subtopic in subtopics:
-                url = f"https://en.wikipedia.org/wiki/{subtopic.replace(' ', '_')}"
-                page_content = self.fetch_web_data(url)
-                df = analyze_data(page_content)
-                data_frames.append(df)
-
-            # Step 3: Combine data
-            combined_data = pd.concat(data_frames, ignore_index=True)
+            cache_key = self.report_cache.key_for(topic, subtopics)
+            if not force_refresh:
+                cached_report = await asyncio.to_thread(self._lookup_cached_report, cache_key, topic)
+                if cached_report:
+                    return cached_report
+
+            # Step 2: Reuse persisted subtopic data, fetching only the subtopics not yet on disk
+            data_paths = [self._subtopic_data_path(subtopic) for subtopic in subtopics]
+            tables: Dict[int, pa.Table] = {}
+            if not force_refresh:
+                tables = await asyncio.to_thread(self._load_subtopic_tables, data_paths)
+            missing = [i for i in range(len(subtopics)) if i not in tables]
+            data_complete = True
+            if missing:
+                async with create_async_client() as client:
+                    pages = await self.fetch_web_data(client, [subtopics[i] for i in missing], force_refresh)
+                analyses = await asyncio.to_thread(analyze_pages, pages)
+                analysis_ok = analyses is not None
+                if not analysis_ok:
+                    # The analysis failed outright; use empty data for this run but persist nothing
+                    data_complete = False
+                    analyses = [{"value": np.empty(0, dtype=np.int64)} for _ in pages]
+                writes = []
+                for i, page_content, analysis in zip(missing, pages, analyses):
+                    tables[i] = pa.table(analysis)
+                    # Failed fetches come back empty; don't persist them
+                    if not page_content:
+                        data_complete = False
+                    elif analysis_ok:
+                        writes.append(asyncio.to_thread(pq.write_table, tables[i], data_paths[i], compression='snappy'))
+                await asyncio.gather(*writes)
+
+            # Step 3: Combine data in Arrow, converting to pandas once
+            combined_data = pa.concat_tables([tables[i] for i in range(len(subtopics))]).to_pandas()
 
             # Step 4: Generate visualizations
-            fig = plt.figure()
-            combined_data['value'].plot(kind='bar')
-            plt.title(f"Data Analysis for {topic}")
-            plt.savefig("analysis_plot.png")
-            plt.close()
-
-            # Step 5: Create presentation
-            presentation_path = create_presentation(topic, "analysis_plot.png")
+            # Rendered to a per-report path so concurrent reports can't overwrite each other's chart
+            plot_path = self.report_cache.plot_path(cache_key)
+            await asyncio.to_thread(self._render_plot, topic, combined_data['value'].to_numpy(), plot_path)
 
-            # Step 6: Generate narration
-            narration = narrate_report(topic, combined_data)
+            # Steps 5 & 6: Create presentation and narration concurrently; neither depends on the other
+            presentation_path, narration = await asyncio.gather(
+                asyncio.to_thread(create_presentation, topic, plot_path),
+                asyncio.to_thread(narrate_report, topic, combined_data),
+            )
 
             # Step 7: Compile report
             report = {
                 "topic": topic,
                 "subtopics": subtopics,
                 "data": combined_data,
-                "visualization": "analysis_plot.png",
+                "visualization": plot_path,
                 "presentation": presentation_path,
                 "narration": narration
             }
+            # A report built from failed fetches or analysis would be served forever; only cache complete ones
+            if data_complete:
+                await asyncio.to_thread(self.report_cache.put, cache_key, report)
             return report
         except Exception as e:
             logger.error(f"Error generating report for {topic}: {e}")
             return {}
 
-    def run(self, main_topic: str):
+    async def run(self, main_topic: str):
         """
         Main execution method to generate report and interact with MCP server.
         """
         try:
-            report = self.generate_research_report(main_topic)
+            report = await self.generate_research_report(main_topic)
             # Send report to MCP server for further processing or storage
-            self.mcp_client.send_report(report)
+            await asyncio.to_thread(self.mcp_client.send_report, report)
             logger.info("Report successfully sent to MCP server.")
         except Exception as e:
             logger.error(f"Error running agent: {e}")
@@ -120,7 +232,10 @@ async def main():
     """
     agent = ResearchAgent(mcp_server_url="http://localhost:8000")
     main_topic = "Artificial Intelligence in Healthcare"
-    agent.run(main_topic)
+    await agent.run(main_topic)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
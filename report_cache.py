@@ -0,0 +1,202 @@
+# report_cache.py
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Semantic lookup is optional; exact-match caching works without it
+    faiss = None
+    SentenceTransformer = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def normalize_topic(topic: str) -> str:
+    """
+    Normalizes a topic string so trivially different spellings share a cache entry.
+
+    Args:
+        topic (str): The raw topic string.
+
+    Returns:
+        str: The lower-cased topic with collapsed whitespace.
+    """
+    return " ".join(topic.lower().split())
+
+def make_cache_key(*parts: str) -> str:
+    """
+    Builds a stable, filesystem-safe cache key from one or more strings.
+
+    Args:
+        *parts (str): Strings identifying the cached item.
+
+    Returns:
+        str: Hex digest of the joined parts.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+class ReportCache:
+    """
+    On-disk cache of compiled research reports with an exact-match lookup on
+    (topic, subtopics) and an optional semantic lookup for near-duplicate topics.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join("cache", "reports"),
+                 similarity_threshold: float = 0.92,
+                 model_name: str = "all-MiniLM-L6-v2") -> None:
+        """
+        Initialize the ReportCache.
+
+        Args:
+            cache_dir (str): Directory holding pickled reports with their Parquet data and plots.
+            similarity_threshold (float): Minimum cosine similarity for a semantic hit.
+            model_name (str): Sentence-transformer model used to embed topics.
+        """
+        self.cache_dir = cache_dir
+        self.similarity_threshold = similarity_threshold
+        self.model_name = model_name
+        self._encoder: Optional[Any] = None
+        self._index: Optional[Any] = None
+        self._index_keys: List[str] = []
+        # Guards the encoder, the FAISS index and _index_keys, which must stay
+        # in step; lookups and stores run from worker threads concurrently
+        self._index_lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key_for(self, topic: str, subtopics: List[str]) -> str:
+        """
+        Returns the exact-match cache key for a topic and its subtopics.
+        """
+        return make_cache_key(normalize_topic(topic), *subtopics)
+
+    def plot_path(self, key: str) -> str:
+        """
+        Returns the path a report's visualization should be rendered to. Each
+        report gets its own file, so concurrent reports never overwrite each other.
+        """
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def _paths(self, key: str) -> tuple:
+        return (os.path.join(self.cache_dir, f"{key}.pkl"),
+                os.path.join(self.cache_dir, f"{key}.parquet"))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Loads a cached report by key.
+
+        Args:
+            key (str): Cache key from key_for().
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached report, or None on a miss.
+        """
+        pickle_path, parquet_path = self._paths(key)
+        if not os.path.exists(pickle_path):
+            return None
+        try:
+            with open(pickle_path, 'rb') as f:
+                report = pickle.load(f)
+            if os.path.exists(parquet_path):
+                report["data"] = pd.read_parquet(parquet_path)
+            logger.info(f"Loaded cached report for '{report.get('topic')}'")
+            return report
+        except Exception as e:
+            logger.error(f"Error loading cached report {key}: {e}")
+            return None
+
+    def put(self, key: str, report: Dict[str, Any]) -> None:
+        """
+        Stores a report, writing its DataFrame to Parquet and the rest to a pickle.
+        The visualization is expected to already live at plot_path(key).
+
+        Args:
+            key (str): Cache key from key_for().
+            report (Dict[str, Any]): The compiled report.
+        """
+        pickle_path, parquet_path = self._paths(key)
+        try:
+            data = report.get("data")
+            if isinstance(data, pd.DataFrame):
+                data.to_parquet(parquet_path)
+            with open(pickle_path, 'wb') as f:
+                pickle.dump({k: v for k, v in report.items() if k != "data"}, f)
+            self._add_to_index(key, report["topic"])
+            logger.info(f"Cached report for '{report['topic']}'")
+        except Exception as e:
+            logger.error(f"Error caching report {key}: {e}")
+
+    def find_similar(self, topic: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a cached report whose topic is semantically close to the given one.
+
+        Args:
+            topic (str): The topic to look up.
+
+        Returns:
+            Optional[Dict[str, Any]]: The closest cached report above the
+            similarity threshold, or None.
+        """
+        with self._index_lock:
+            if not self._ensure_index() or self._index.ntotal == 0:
+                return None
+            scores, ids = self._index.search(self._embed([topic]), 1)
+            key = self._index_keys[ids[0][0]]
+        if scores[0][0] < self.similarity_threshold:
+            return None
+        logger.info(f"Semantic cache hit for '{topic}' (similarity {scores[0][0]:.3f})")
+        return self.get(key)
+
+    def _embed(self, topics: List[str]) -> np.ndarray:
+        vectors = self._encoder.encode([normalize_topic(t) for t in topics], normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _ensure_index(self) -> bool:
+        """
+        Lazily loads the encoder and indexes the topics of reports already on disk.
+        The index is published only once fully built. Callers hold _index_lock.
+        """
+        if self._index is not None:
+            return True
+        if faiss is None or SentenceTransformer is None:
+            return False
+        try:
+            self._encoder = SentenceTransformer(self.model_name)
+            index = faiss.IndexFlatIP(self._encoder.get_sentence_embedding_dimension())
+        except Exception as e:
+            logger.error(f"Error initializing semantic cache: {e}")
+            return False
+        keys, topics = [], []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pkl"):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name), 'rb') as f:
+                    topics.append(pickle.load(f)["topic"])
+                keys.append(name[:-len(".pkl")])
+            except Exception as e:
+                logger.error(f"Skipping unreadable cache entry {name}: {e}")
+        if topics:
+            index.add(self._embed(topics))
+        self._index_keys = keys
+        self._index = index
+        return True
+
+    def _add_to_index(self, key: str, topic: str) -> None:
+        with self._index_lock:
+            if self._index is not None:
+                self._index.add(self._embed([topic]))
+                self._index_keys.append(key)
@@ -0,0 +1,22 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import generate_report
+
+
+@pytest.mark.parametrize("df", [
+    pd.DataFrame({"value": [3]}),
+    pd.DataFrame({"value": [1, 2, 3, 4], "empty": [np.nan] * 4}),
+    pd.DataFrame({"value": [1.5, np.nan, 1000002.0], "count": [1, 2, 3], "label": list("abc")}),
+    pd.DataFrame({"value": [1, 2, 3], "when": pd.to_datetime(["2024-01-01", "2024-06-01", "2025-01-01"])}),
+    pd.DataFrame({"value": [1, 2, 3], "elapsed": pd.to_timedelta([1, 2, 3], unit="s")}),
+    pd.DataFrame({"value": pd.array([1, 2, None], dtype="Int64"), "ratio": pd.array([0.5, None, 2.0], dtype="Float64")}),
+])
+def test_generate_report_matches_describe(df):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        report = generate_report(df, report_title="Title")
+    assert report == "Title\n\n" + df.describe().to_string()
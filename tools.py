@@ -1,75 +1,103 @@
 # tools.py
 
+import gzip
+import os
+import warnings
 import requests
-from bs4 import BeautifulSoup
+import lxml.html
+import numba
+import numpy as np
+from numba import njit, prange
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Headless backend; select before pyplot is imported
 import matplotlib.pyplot as plt
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 import logging
 
+from http_session import SESSION
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def fetch_web_page(url: str, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
-    """
-    Fetches the content of a web page.
-    
-    Args:
-        url (str): The URL of the web page to fetch.
-        headers (Optional[Dict[str, str]]): Optional HTTP headers.
-        
-    Returns:
-        Optional[str]: The HTML content of the page if successful, None otherwise.
-    """
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        logger.info(f"Successfully fetched URL: {url}")
-        return response.text
-    except requests.RequestException as e:
-        logger.error(f"Error fetching URL {url}: {e}")
-        return None
+# Reports above this size are written gzip-compressed
+REPORT_COMPRESSION_THRESHOLD = 1 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+# Bytes fed to the HTML parser per network read when streaming
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Use every available core for the parallel analysis kernel
+numba.set_num_threads(min(os.cpu_count() or 1, numba.config.NUMBA_NUM_THREADS))
 
-def parse_html_for_data(html_content: str, parser: str = 'html.parser') -> Optional[BeautifulSoup]:
+def parse_html_for_data(html_content: Union[str, bytes]) -> Optional[lxml.html.HtmlElement]:
     """
-    Parses HTML content using BeautifulSoup.
+    Parses HTML content into an lxml element tree.
     
     Args:
-        html_content (str): The HTML content to parse.
-        parser (str): The parser to use (default is 'html.parser').
+        html_content (Union[str, bytes]): The HTML content to parse.
         
     Returns:
-        Optional[BeautifulSoup]: Parsed BeautifulSoup object if successful, None otherwise.
+        Optional[lxml.html.HtmlElement]: Root of the parsed tree if successful, None otherwise.
     """
     try:
-        soup = BeautifulSoup(html_content, parser)
+        tree = lxml.html.fromstring(html_content)
         logger.info("HTML content parsed successfully.")
-        return soup
+        return tree
     except Exception as e:
         logger.error(f"Error parsing HTML content: {e}")
         return None
 
-def extract_data_from_html(soup: BeautifulSoup, selector: str) -> List[str]:
+def extract_data_from_html(tree: lxml.html.HtmlElement, selector: str) -> List[str]:
     """
     Extracts data from HTML using a CSS selector.
     
     Args:
-        soup (BeautifulSoup): Parsed HTML content.
+        tree (lxml.html.HtmlElement): Parsed HTML content.
         selector (str): CSS selector string.
         
     Returns:
         List[str]: List of extracted text data.
     """
     try:
-        elements = soup.select(selector)
-        data = [element.get_text(strip=True) for element in elements]
+        elements = tree.cssselect(selector)
+        data = [element.text_content().strip() for element in elements]
         logger.info(f"Extracted {len(data)} elements using selector '{selector}'.")
         return data
     except Exception as e:
         logger.error(f"Error extracting data with selector '{selector}': {e}")
         return []
 
+def stream_parse_web_page(url: str, headers: Optional[Dict[str, str]] = None) -> Optional[lxml.html.HtmlElement]:
+    """
+    Fetches a web page and parses it incrementally as the body arrives, so
+    the full response is never buffered alongside the parsed tree.
+    
+    Args:
+        url (str): URL of the web page.
+        headers (Optional[Dict[str, str]]): Optional HTTP headers.
+        
+    Returns:
+        Optional[lxml.html.HtmlElement]: Root of the parsed tree if successful, None otherwise.
+    """
+    try:
+        with SESSION.get(url, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            # Only trust an explicit charset; requests otherwise assumes ISO-8859-1 for text/*
+            has_charset = 'charset' in response.headers.get('content-type', '').lower()
+            parser = lxml.html.HTMLParser(encoding=response.encoding if has_charset else 'utf-8')
+            for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                parser.feed(chunk)
+            tree = parser.close()
+        logger.info(f"Successfully fetched and parsed URL: {url}")
+        return tree
+    except requests.RequestException as e:
+        logger.error(f"Error fetching URL {url}: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Error parsing HTML content from {url}: {e}")
+        return None
+
 def fetch_and_parse(url: str, selector: str, headers: Optional[Dict[str, str]] = None) -> List[str]:
     """
     Fetches a web page and extracts data based on a CSS selector.
@@ -82,13 +110,76 @@ def fetch_and_parse(url: str, selector: str, headers: Optional[Dict[str, str]] =
     Returns:
         List[str]: Extracted data list.
     """
-    html = fetch_web_page(url, headers)
-    if html:
-        soup = parse_html_for_data(html)
-        if soup:
-            return extract_data_from_html(soup, selector)
+    tree = stream_parse_web_page(url, headers)
+    if tree is not None:
+        return extract_data_from_html(tree, selector)
     return []
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _reduce(buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Counts whitespace-separated words in each [start, end) row of a byte buffer.
+    Rows are independent, so they are spread across threads with prange.
+    """
+    counts = np.zeros(len(starts), dtype=np.int64)
+    for row in prange(len(starts)):
+        words = 0
+        in_word = False
+        for i in range(starts[row], ends[row]):
+            byte = buffer[i]
+            if byte == 32 or (9 <= byte <= 13):
+                in_word = False
+            elif not in_word:
+                in_word = True
+                words += 1
+        counts[row] = words
+    return counts
+
+def analyze_pages(pages: List[str]) -> Optional[List[Dict[str, np.ndarray]]]:
+    """
+    Analyzes several pages in one kernel call, measuring the word count of
+    each non-empty paragraph. Batching lets prange spread the rows of every
+    page across cores at once, without pickling pages to worker processes.
+    
+    Args:
+        pages (List[str]): Plain text of each fetched page.
+        
+    Returns:
+        Optional[List[Dict[str, np.ndarray]]]: One set of column arrays per
+        page, in input order ('value' holds one word count per paragraph),
+        or None if the analysis failed.
+    """
+    try:
+        encoded = [page.encode('utf-8') for page in pages]
+        # Pages are joined on a newline so no row spans two pages
+        buffer = np.frombuffer(b"\n".join(encoded), dtype=np.uint8)
+        breaks = np.flatnonzero(buffer == ord('\n'))
+        starts = np.concatenate(([0], breaks + 1))
+        ends = np.concatenate((breaks, [len(buffer)]))
+        counts = _reduce(buffer, starts, ends)
+        rows_per_page = np.fromiter((page.count(b"\n") + 1 for page in encoded), dtype=np.int64, count=len(encoded))
+        results = [{"value": page_counts[page_counts > 0]}
+                   for page_counts in np.split(counts, np.cumsum(rows_per_page)[:-1])] if encoded else []
+        logger.info(f"Analyzed {sum(len(r['value']) for r in results)} paragraphs across {len(results)} pages.")
+        return results
+    except Exception as e:
+        logger.error(f"Error analyzing data: {e}")
+        return None
+
+def analyze_data(page_content: str) -> Dict[str, np.ndarray]:
+    """
+    Analyzes page text, measuring the word count of each non-empty paragraph.
+    
+    Args:
+        page_content (str): Plain text of a fetched page.
+        
+    Returns:
+        Dict[str, np.ndarray]: Column arrays keyed by column name; 'value'
+        holds one word count per paragraph.
+    """
+    results = analyze_pages([page_content])
+    return results[0] if results is not None else {"value": np.empty(0, dtype=np.int64)}
+
 def generate_plot(data: List[float], title: str = "Data Plot") -> Optional[str]:
     """
     Generates a bar plot from numerical data.
@@ -133,6 +224,37 @@ def create_dataframe(data: List[Dict[str, Any]]) -> pd.DataFrame:
         logger.error(f"Error creating DataFrame: {e}")
         return pd.DataFrame()
 
+def _summarize_numeric(df: pd.DataFrame) -> str:
+    """
+    Formats count/mean/std/min/quartiles/max of the numeric columns like
+    DataFrame.describe(), but computed with direct NumPy reductions. Only the
+    small result table goes through pandas, for describe()'s float formatting.
+    """
+    # describe() also summarizes datetimes and formats timedelta/nullable columns
+    # its own way; only plain NumPy int/float frames take the fast path
+    described = df.select_dtypes(include=['number', 'datetime', 'datetimetz', 'timedelta'])
+    plain = all(isinstance(dtype, np.dtype) and dtype.kind in 'iuf' for dtype in described.dtypes)
+    if described.shape[1] == 0 or described.shape[0] == 0 or not plain:
+        return df.describe().to_string()
+    numeric = described
+    arr = numeric.to_numpy(dtype=np.float64)
+    # Single-row frames and all-NaN columns yield NaN stats; describe() returns those silently
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        q25, q50, q75 = np.nanquantile(arr, [0.25, 0.5, 0.75], axis=0)
+        stats = {
+            "count": np.count_nonzero(~np.isnan(arr), axis=0).astype(np.float64),
+            "mean": np.nanmean(arr, axis=0),
+            "std": np.nanstd(arr, axis=0, ddof=1),
+            "min": np.nanmin(arr, axis=0),
+            "25%": q25,
+            "50%": q50,
+            "75%": q75,
+            "max": np.nanmax(arr, axis=0),
+        }
+    summary = pd.DataFrame(np.vstack(list(stats.values())), index=list(stats), columns=numeric.columns)
+    return summary.to_string()
+
 def generate_report(df: pd.DataFrame, report_title: str = "Research Report") -> str:
     """
     Generates a simple textual report from a DataFrame.
@@ -146,7 +268,7 @@ def generate_report(df: pd.DataFrame, report_title: str = "Research Report") ->
     """
     try:
         report = f"{report_title}\n\n"
-        report += df.describe().to_string()
+        report += _summarize_numeric(df)
         logger.info("Report generated successfully.")
         return report
     except Exception as e:
@@ -155,7 +277,8 @@ def generate_report(df: pd.DataFrame, report_title: str = "Research Report") ->
 
 def save_text_report(report: str, filename: str = "research_report.txt") -> bool:
     """
-    Saves a text report to a file.
+    Saves a text report to a file. Reports larger than
+    REPORT_COMPRESSION_THRESHOLD bytes are gzip-compressed to filename + '.gz'.
     
     Args:
         report (str): The report content.
@@ -165,8 +288,15 @@ def save_text_report(report: str, filename: str = "research_report.txt") -> bool
         bool: True if saved successfully, False otherwise.
     """
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(report)
+        data = report.encode('utf-8')
+        if len(data) > REPORT_COMPRESSION_THRESHOLD:
+            filename += '.gz'
+            # Level 1 is several times faster than the default and still shrinks text well
+            with gzip.open(filename, 'wb', compresslevel=1) as f:
+                f.write(data)
+        else:
+            with open(filename, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                f.write(data)
         logger.info(f"Report saved to {filename}")
         return True
     except Exception as e: